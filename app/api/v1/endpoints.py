@@ -1,6 +1,11 @@
 """API v1 endpoints for document upload, semantic search, and RAG chat."""
 
+import asyncio
+import hashlib
+import json
+
 from fastapi import APIRouter, UploadFile, File, HTTPException, Body
+from fastapi.responses import StreamingResponse
 
 from app.services.document_service import document_service
 from app.services.vector_service import vector_service
@@ -14,14 +19,24 @@ router = APIRouter(tags=["RAG"])
 async def upload_document(file: UploadFile = File(...)):
     """Upload a PDF document, extract text, chunk it, and store embeddings."""
     try:
-        chunks = await document_service.process_file(file)
-        metadatas = [{"source": file.filename} for _ in chunks]
-        vector_service.add_texts(texts=chunks, metadatas=metadatas)
+        data = await file.read()
+        chunks = await document_service.process_file(data, file.filename, file.content_type)
+        metadatas = [
+            {"source": file.filename, "idx": i, "sha": hashlib.sha256(chunk.encode()).hexdigest()}
+            for i, chunk in enumerate(chunks)
+        ]
+        ids = [
+            hashlib.sha256(f"{file.filename}:{meta['sha']}".encode()).hexdigest()
+            for meta in metadatas
+        ]
+        await vector_service.aadd_texts(texts=chunks, metadatas=metadatas, ids=ids)
+        await vector_service.reconcile_source(file.filename, ids, metadatas)
+        await asyncio.to_thread(rag_service.cache.clear)
 
         return DocumentResponse(
             filename=file.filename,
             content_type=file.content_type,
-            size=file.size or 0,
+            size=len(data),
             chunks_created=len(chunks),
             message="File processed and embeddings stored successfully.",
         )
@@ -32,10 +47,10 @@ async def upload_document(file: UploadFile = File(...)):
 
 
 @router.post("/search")
-async def search_documents(query: str = Body(..., embed=True), k: int = 3):
+async def search_documents(query: str = Body(..., embed=True, min_length=1), k: int = 3):
     """Perform a raw semantic search and return matching text chunks."""
     try:
-        results = vector_service.search_similar(query, k=k)
+        results = await vector_service.search_similar(query, k=k)
         return {
             "query": query,
             "results": [doc.page_content for doc in results],
@@ -54,4 +69,22 @@ async def chat_with_docs(request: ChatRequest):
             sources=response["sources"],
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_with_docs_stream(request: ChatRequest):
+    """Ask a question and stream the generated answer as Server-Sent Events."""
+
+    async def event_stream():
+        try:
+            async for frame in rag_service.stream_answer(request.query, request.k):
+                yield frame
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
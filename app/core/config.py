@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -15,12 +15,29 @@ class Settings(BaseSettings):
     # Google Gemini API
     GOOGLE_API_KEY: str = Field(..., env="GOOGLE_API_KEY")
     EMBEDDING_MODEL: str = "models/gemini-embedding-001"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_CONCURRENCY: int = 16
+    QUERY_BATCH_MAX_SIZE: int = 32
+    QUERY_BATCH_WINDOW_MS: int = 10
+    EMBEDDING_CACHE_PATH: str = "data/embed_cache.sqlite3"
     LLM_MODEL: str = "gemini-2.0-flash"
     LLM_FALLBACK_MODELS: List[str] = ["gemini-2.0-flash-lite", "gemini-2.5-flash"]
 
+    # Document ingestion (None = one process per CPU core)
+    INGEST_PROCESS_WORKERS: Optional[int] = None
+
+    # Semantic answer cache
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10_000
+    SEMANTIC_CACHE_TTL_SECONDS: Optional[float] = 3600
+
     # ChromaDB Vector Store
     CHROMA_PERSIST_DIR: str = "data/chroma_db"
     COLLECTION_NAME: str = "ecommerce_docs"
+    HNSW_SPACE: str = "cosine"
+    HNSW_M: int = 32
+    HNSW_CONSTRUCTION_EF: int = 200
+    HNSW_SEARCH_EF: int = 40
 
     class Config:
         env_file = ".env"
@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.v1.endpoints import router as api_router
+from app.services.document_service import document_service
 from app.utils.logger import logger
 
 
@@ -31,6 +32,11 @@ def create_application() -> FastAPI:
     async def startup_event():
         logger.info(f"{settings.PROJECT_NAME} v{settings.VERSION} starting up...")
 
+    @application.on_event("shutdown")
+    async def shutdown_event():
+        document_service.shutdown()
+        logger.info(f"{settings.PROJECT_NAME} shut down.")
+
     @application.get("/health", tags=["Health"])
     async def health_check():
         """Returns application health status."""
@@ -1,28 +1,81 @@
 """Service for uploading, validating, and chunking PDF documents."""
 
+import asyncio
+import multiprocessing
+import os
+import pymupdf
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List
-from fastapi import UploadFile, HTTPException
-from pypdf import PdfReader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from fastapi import HTTPException
 
+from app.core.config import settings
 from app.utils.logger import logger
+from app.utils.text_splitter import FastTextSplitter
+
+# Never fork the server: by the first upload it already runs gRPC channels and
+# Chroma threads, which are not fork-safe.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    """Create the process pool used for PDF extraction and chunking."""
+    return ProcessPoolExecutor(
+        max_workers=settings.INGEST_PROCESS_WORKERS or os.cpu_count(),
+        mp_context=_MP_CONTEXT,
+    )
+
+
+TEXT_SPLITTER = FastTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200,
+    separators=["\n\n", "\n", " ", ""],
+)
+
+
+def _extract_and_chunk(data: bytes) -> List[str]:
+    """Extract text from raw PDF bytes and split it into chunks.
+
+    Runs inside a worker process so CPU-bound parsing and splitting never
+    block the event loop. Returns an empty list when the PDF has no text.
+    """
+    with pymupdf.open(stream=data, filetype="pdf") as pdf:
+        text_content = "\n".join(page.get_text("text") for page in pdf)
+
+    if not text_content.strip():
+        return []
+    return TEXT_SPLITTER.split_text(text_content)
 
 
 class DocumentService:
-    """Handles PDF ingestion and text chunking using recursive character splitting."""
+    """Handles PDF ingestion and text chunking using separator-aware window splitting."""
 
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", " ", ""],
-        )
+        self.text_splitter = TEXT_SPLITTER
+        self.pool = _new_pool()
 
-    async def process_file(self, file: UploadFile) -> List[str]:
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a fresh process pool once a worker has died.
+
+        Concurrent uploads hitting the same broken pool only replace it once.
+        """
+        if self.pool is broken:
+            self.pool = _new_pool()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """Stop the extraction process pool."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def process_file(self, data: bytes, filename: str, content_type: str) -> List[str]:
         """Validate, extract text from, and chunk a PDF file.
 
         Args:
-            file: The uploaded PDF file.
+            data: Raw bytes of the uploaded file.
+            filename: Original name of the uploaded file.
+            content_type: MIME type reported by the client.
 
         Returns:
             A list of text chunks ready for embedding.
@@ -30,34 +83,36 @@ class DocumentService:
         Raises:
             HTTPException: If the file type is invalid or text extraction fails.
         """
-        logger.info(f"Processing file: {file.filename}")
+        logger.info(f"Processing file: {filename}")
 
-        if file.content_type != "application/pdf":
-            logger.error(f"Rejected file type: {file.content_type}")
+        if content_type != "application/pdf":
+            logger.error(f"Rejected file type: {content_type}")
             raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
         try:
-            pdf_reader = PdfReader(file.file)
-            text_content = ""
-            for page in pdf_reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text_content += extracted + "\n"
-
-            if not text_content.strip():
+            pool = self.pool
+            loop = asyncio.get_running_loop()
+            chunks = await loop.run_in_executor(pool, _extract_and_chunk, data)
+
+            if not chunks:
                 raise HTTPException(
                     status_code=422,
                     detail="PDF contains no extractable text (may be scanned/image-based).",
                 )
         except HTTPException:
             raise
+        except BrokenProcessPool:
+            logger.error(f"Extraction worker crashed on '{filename}' — restarting process pool.")
+            self._replace_pool(pool)
+            raise HTTPException(
+                status_code=500, detail="Failed to process PDF: extraction worker crashed."
+            )
         except Exception as e:
             logger.error(f"Failed to read PDF: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to process PDF: {e}")
 
-        chunks = self.text_splitter.split_text(text_content)
-        logger.info(f"Processed '{file.filename}' into {len(chunks)} chunks.")
+        logger.info(f"Processed '{filename}' into {len(chunks)} chunks.")
         return chunks
 
 
-document_service = DocumentService()
\ No newline at end of file
+document_service = DocumentService()
@@ -0,0 +1,82 @@
+"""Micro-batching of concurrent embedding requests into single API calls."""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+ErrorPredicate = Callable[[BaseException], bool]
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``embed`` calls into batched embedding requests.
+
+    Requests are queued and drained by a background coroutine, which dispatches
+    a batch once ``max_batch_size`` items have accumulated or ``max_wait``
+    seconds have passed since the first item arrived. Each batch is sent in its
+    own task so the next window starts collecting immediately.
+
+    If a batched call fails with an error that ``is_input_error`` attributes to
+    the inputs (e.g. one invalid query), its items are retried individually so
+    only the offending caller fails. Any other error (rate limit, network) is
+    propagated to every caller in the batch without further API calls.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+        is_input_error: ErrorPredicate = lambda error: False,
+    ):
+        self._embed_fn = embed_fn
+        self._is_input_error = is_input_error
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text, sharing the API call with concurrent requests."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await self._embed_fn([text for text, _ in batch])
+        except Exception as e:
+            if len(batch) > 1 and self._is_input_error(e):
+                # Retry one by one so a single bad query only fails its own caller.
+                await asyncio.gather(*(self._dispatch([item]) for item in batch))
+                return
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
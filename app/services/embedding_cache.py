@@ -0,0 +1,58 @@
+"""On-disk embedding cache keyed by content hash."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Persistent map from chunk content to its embedding vector.
+
+    Keys are SHA-256 digests of the embedding model name and the chunk text, so
+    identical content is embedded once across uploads and files. Vectors are
+    stored as float16 to halve disk usage and returned as float32.
+    """
+
+    _BATCH = 500  # stays below SQLite's bound-parameter limit
+
+    def __init__(self, path: str, model: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._model = model
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def key(self, text: str) -> bytes:
+        """Return the cache key for a chunk of text."""
+        return hashlib.sha256(f"{self._model}\0{text}".encode()).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Return cached vectors for whichever of the given keys are present."""
+        found: Dict[bytes, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), self._BATCH):
+                batch = keys[start:start + self._BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+        return found
+
+    def put_many(self, items: Dict[bytes, List[float]]) -> None:
+        """Store vectors under their keys, replacing any existing entries."""
+        rows = [
+            (key, np.asarray(vector, dtype=np.float16).tobytes())
+            for key, vector in items.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows)
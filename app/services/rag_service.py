@@ -1,28 +1,38 @@
 """RAG service: retrieves context from the vector store and generates answers via Gemini."""
 
-from typing import Any, Dict, List
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from app.core.config import settings
+from app.services.semantic_cache import SemanticCache
 from app.services.vector_service import vector_service
 from app.utils.logger import logger
 
-SYSTEM_PROMPT = """\
+# Static instructions come first so every request shares an identical prompt
+# prefix (eligible for Gemini's implicit prefix caching); per-request content
+# is appended after it.
+STATIC_SYSTEM = """\
 You are a helpful and professional AI assistant for an E-Commerce system.
 
-Answer the question based ONLY on the following context.
+Answer the question based ONLY on the context provided in the user message.
 If the answer is not in the context, strictly say "I don't have enough information to answer that."
 Do not make up facts.
+"""
 
-Context:
+USER_PROMPT = """\
+<context>
 {context}
+</context>
 
-Question:
-{question}
+Question: {question}
 """
 
+NO_DOCUMENTS_ANSWER = "I couldn't find any relevant documents to answer your question."
+
 
 class RAGService:
     """Orchestrates retrieval-augmented generation with automatic LLM fallback."""
@@ -30,33 +40,97 @@ class RAGService:
     def __init__(self):
         self.model_names: List[str] = [settings.LLM_MODEL] + settings.LLM_FALLBACK_MODELS
 
-        self.llms = [
-            ChatGoogleGenerativeAI(
-                model=name,
+        self._llm_cache: Dict[str, ChatGoogleGenerativeAI] = {}
+        self._get_llm(settings.LLM_MODEL)
+        logger.info(f"RAG Service ready — models: {self.model_names}")
+
+        self.prompt = ChatPromptTemplate.from_messages(
+            [("system", STATIC_SYSTEM), ("human", USER_PROMPT)]
+        )
+
+        self.cache = SemanticCache(
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            ttl=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        )
+
+    def _get_llm(self, model_name: str) -> ChatGoogleGenerativeAI:
+        """Return the client for a model, building it on first use.
+
+        Fallback models are only needed on rate-limit errors, so their clients
+        are created lazily and then reused.
+        """
+        llm = self._llm_cache.get(model_name)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(
+                model=model_name,
                 google_api_key=settings.GOOGLE_API_KEY,
                 temperature=0.2,
                 convert_system_message_to_human=True,
             )
-            for name in self.model_names
-        ]
-        logger.info(f"RAG Service ready — models: {self.model_names}")
-
-        self.prompt = ChatPromptTemplate.from_template(SYSTEM_PROMPT)
+            self._llm_cache[model_name] = llm
+        return llm
 
     @staticmethod
     def _format_docs(docs) -> str:
         """Concatenate document page contents into a single context string."""
         return "\n\n".join(doc.page_content for doc in docs)
 
+    @staticmethod
+    def _stable_order(docs) -> list:
+        """Sort documents by a stable key so identical retrieval sets yield identical prompts."""
+        return sorted(
+            docs,
+            key=lambda doc: (
+                doc.metadata.get("source", ""),
+                doc.metadata.get("idx", -1),
+                doc.page_content,
+            ),
+        )
+
     @staticmethod
     def _deduplicate(docs) -> list:
-        """Remove duplicate chunks based on content."""
-        seen, unique = set(), []
+        """Remove duplicate chunks based on content, keeping the first occurrence."""
+        unique = {}
         for doc in docs:
-            if doc.page_content not in seen:
-                unique.append(doc)
-                seen.add(doc.page_content)
-        return unique
+            unique.setdefault(doc.page_content, doc)
+        return list(unique.values())
+
+    @staticmethod
+    def _build_sources(docs) -> List[Dict[str, str]]:
+        """Build the truncated source list returned alongside an answer."""
+        return [
+            {
+                "source": doc.metadata.get("source", "unknown"),
+                "content": doc.page_content[:200] + "...",
+            }
+            for doc in docs
+        ]
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """Whether an LLM error should trigger a fallback to the next model."""
+        return "RESOURCE_EXHAUSTED" in str(error) or "429" in str(error)
+
+    @staticmethod
+    def _sse(data: Any, event: Optional[str] = None) -> str:
+        """Format a single Server-Sent Events frame."""
+        frame = f"event: {event}\n" if event else ""
+        return frame + f"data: {json.dumps(data)}\n\n"
+
+    async def _cache_response(
+        self, query_embedding: List[float], k: int, response: Dict[str, Any], generation: int
+    ) -> None:
+        """Store a generated response in the semantic cache, never failing the request."""
+        try:
+            await asyncio.to_thread(self.cache.store, query_embedding, k, response, generation)
+        except Exception as e:
+            logger.warning(f"Failed to cache answer: {e}")
+
+    async def _retrieve(self, query_embedding: List[float], k: int) -> list:
+        """Retrieve, deduplicate, and stably order context chunks."""
+        docs = await vector_service.search_by_vector(query_embedding, k)
+        return self._stable_order(self._deduplicate(docs))
 
     async def generate_answer(self, query: str, k: int = 3) -> Dict[str, Any]:
         """Execute the full RAG pipeline: retrieve → deduplicate → generate → respond.
@@ -70,41 +144,96 @@ class RAGService:
         """
         logger.info(f"RAG query: '{query}'")
 
-        docs = vector_service.search_similar(query, k)
-        if not docs:
-            return {
-                "answer": "I couldn't find any relevant documents to answer your question.",
-                "sources": [],
-            }
+        query_embedding = await vector_service.embed_query(query)
+        generation = self.cache.generation
+        cached = await asyncio.to_thread(self.cache.lookup, query_embedding, k)
+        if cached is not None:
+            logger.info("Semantic cache hit — returning cached answer.")
+            return cached
+
+        unique_docs = await self._retrieve(query_embedding, k)
+        if not unique_docs:
+            return {"answer": NO_DOCUMENTS_ANSWER, "sources": []}
 
-        unique_docs = self._deduplicate(docs)
         context_text = self._format_docs(unique_docs)
 
         last_error = None
-        for llm, model_name in zip(self.llms, self.model_names):
+        for model_name in self.model_names:
             try:
                 logger.info(f"Invoking model: {model_name}")
-                chain = self.prompt | llm | StrOutputParser()
+                chain = self.prompt | self._get_llm(model_name) | StrOutputParser()
                 answer = await chain.ainvoke({"context": context_text, "question": query})
+            except Exception as e:
+                last_error = e
+                if self._is_rate_limited(e):
+                    logger.warning(f"{model_name} rate-limited — falling back...")
+                    continue
+                logger.error(f"LLM error on {model_name}: {e}")
+                raise
+
+            logger.info(f"Answer generated successfully via {model_name}.")
+            response = {"answer": answer, "sources": self._build_sources(unique_docs)}
+            await self._cache_response(query_embedding, k, response, generation)
+            return response
+
+        logger.error(f"All models exhausted. Last error: {last_error}")
+        raise last_error  # type: ignore[misc]
+
+    async def stream_answer(self, query: str, k: int = 3) -> AsyncIterator[str]:
+        """Execute the RAG pipeline and stream the answer as Server-Sent Events.
 
-                logger.info(f"Answer generated successfully via {model_name}.")
-                sources = [
-                    {
-                        "source": doc.metadata.get("source", "unknown"),
-                        "content": doc.page_content[:200] + "...",
-                    }
-                    for doc in unique_docs
-                ]
-                return {"answer": answer, "sources": sources}
+        Yields ``data`` frames carrying ``{"delta": ...}`` answer fragments,
+        followed by a final ``sources`` event. Fallback models are only tried
+        when generation fails before the first fragment has been sent.
 
+        Args:
+            query: The user's natural-language question.
+            k: Number of context chunks to retrieve.
+        """
+        logger.info(f"RAG stream query: '{query}'")
+
+        query_embedding = await vector_service.embed_query(query)
+        generation = self.cache.generation
+        cached = await asyncio.to_thread(self.cache.lookup, query_embedding, k)
+        if cached is not None:
+            logger.info("Semantic cache hit — streaming cached answer.")
+            yield self._sse({"delta": cached["answer"]})
+            yield self._sse(cached["sources"], event="sources")
+            return
+
+        unique_docs = await self._retrieve(query_embedding, k)
+        if not unique_docs:
+            yield self._sse({"delta": NO_DOCUMENTS_ANSWER})
+            yield self._sse([], event="sources")
+            return
+
+        context_text = self._format_docs(unique_docs)
+
+        last_error = None
+        for model_name in self.model_names:
+            parts: List[str] = []
+            try:
+                logger.info(f"Streaming from model: {model_name}")
+                chain = self.prompt | self._get_llm(model_name) | StrOutputParser()
+                async for chunk in chain.astream({"context": context_text, "question": query}):
+                    parts.append(chunk)
+                    yield self._sse({"delta": chunk})
             except Exception as e:
                 last_error = e
-                if "RESOURCE_EXHAUSTED" in str(e) or "429" in str(e):
+                if not parts and self._is_rate_limited(e):
                     logger.warning(f"{model_name} rate-limited — falling back...")
                     continue
                 logger.error(f"LLM error on {model_name}: {e}")
                 raise
 
+            logger.info(f"Answer streamed successfully via {model_name}.")
+            sources = self._build_sources(unique_docs)
+            await self._cache_response(
+                query_embedding, k, {"answer": "".join(parts), "sources": sources}, generation
+            )
+            yield self._sse(sources, event="sources")
+            return
+
         logger.error(f"All models exhausted. Last error: {last_error}")
         raise last_error  # type: ignore[misc]
 
@@ -0,0 +1,120 @@
+"""Semantic answer cache keyed by query-embedding cosine similarity."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """LRU cache that returns a stored RAG response for near-duplicate queries.
+
+    Query embeddings are L2-normalised and kept in a single float32 matrix so a
+    lookup is one matrix-vector product. The matrix grows in fixed-size row
+    blocks to amortise copies, and evicted rows are recycled. Entries older than
+    ``ttl`` seconds are never returned.
+
+    ``clear()`` bumps ``generation``; callers read it before ``lookup`` and pass
+    it to ``store``, which ignores answers computed before the last clear.
+
+    Callers on an event loop should run ``lookup``/``store`` in a worker
+    thread; all public methods are serialised by an internal lock.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        block_rows: int = 1024,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.block_rows = block_rows
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self.generation += 1
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._ks = np.zeros(0, dtype=np.int32)
+            self._ts = np.zeros(0, dtype=np.float64)
+            self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+            self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _allocate_slot(self, dim: int) -> int:
+        """Return a free matrix row, evicting or growing the matrix if needed."""
+        if len(self._entries) >= self.max_entries:
+            slot, _ = self._entries.popitem(last=False)
+            return slot
+        if self._free:
+            return self._free.pop()
+
+        size = len(self._ks)
+        new_size = min(size + self.block_rows, self.max_entries)
+        matrix = np.zeros((new_size, dim), dtype=np.float32)
+        if size:
+            matrix[:size] = self._matrix
+        ks = np.full(new_size, -1, dtype=np.int32)
+        ks[:size] = self._ks
+        ts = np.zeros(new_size, dtype=np.float64)
+        ts[:size] = self._ts
+        self._matrix, self._ks, self._ts = matrix, ks, ts
+        self._free.extend(range(new_size - 1, size, -1))
+        return size
+
+    def lookup(self, embedding: List[float], k: int) -> Optional[Dict[str, Any]]:
+        """Return the cached, unexpired response for a similar query retrieved with the same k."""
+        query = self._normalize(embedding)
+        with self._lock:
+            if not self._entries:
+                return None
+
+            sims = self._matrix @ query
+            stale = self._ks != k
+            if self.ttl is not None:
+                stale |= self._ts < time.time() - self.ttl
+            sims[stale] = -1.0
+            slot = int(np.argmax(sims))
+            if sims[slot] < self.threshold:
+                return None
+
+            self._entries.move_to_end(slot)
+            return self._entries[slot]
+
+    def store(
+        self,
+        embedding: List[float],
+        k: int,
+        response: Dict[str, Any],
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a response under the given query embedding.
+
+        If ``generation`` is given and the cache has been cleared since, the
+        response predates the current corpus and is dropped.
+        """
+        vec = self._normalize(embedding)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            slot = self._allocate_slot(vec.shape[0])
+            self._matrix[slot] = vec
+            self._ks[slot] = k
+            self._ts[slot] = time.time()
+            self._entries[slot] = response
@@ -1,11 +1,18 @@
 """Service for embedding storage and semantic search using ChromaDB."""
 
+import asyncio
 import os
-from typing import List, Optional
+import sqlite3
+import uuid
+from typing import Dict, List, Optional, Tuple
+from google.api_core.exceptions import InvalidArgument
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
+from chromadb.utils.batch_utils import create_batches
 
 from app.core.config import settings
+from app.services.embedding_batcher import MicroBatcher
+from app.services.embedding_cache import EmbeddingCache
 from app.utils.logger import logger
 
 
@@ -18,30 +25,233 @@ class VectorService:
             google_api_key=settings.GOOGLE_API_KEY,
         )
 
+        # Shared across uploads so the cap bounds total in-flight embed calls.
+        self._embed_semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+
+        self.embedding_cache = EmbeddingCache(
+            settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_MODEL
+        )
+
+        self.query_batcher = MicroBatcher(
+            self._embed_queries,
+            max_batch_size=settings.QUERY_BATCH_MAX_SIZE,
+            max_wait=settings.QUERY_BATCH_WINDOW_MS / 1000,
+            is_input_error=self._is_invalid_input,
+        )
+
         self.vector_db = Chroma(
             persist_directory=settings.CHROMA_PERSIST_DIR,
             embedding_function=self.embedding_function,
             collection_name=settings.COLLECTION_NAME,
+            collection_metadata={
+                "hnsw:space": settings.HNSW_SPACE,
+                "hnsw:M": settings.HNSW_M,
+                "hnsw:construction_ef": settings.HNSW_CONSTRUCTION_EF,
+                "hnsw:search_ef": settings.HNSW_SEARCH_EF,
+            },
         )
+        self._enable_wal()
         logger.info(f"ChromaDB initialized at '{settings.CHROMA_PERSIST_DIR}'.")
 
-    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> None:
-        """Embed and store text chunks in the vector database.
+    @staticmethod
+    def _enable_wal() -> None:
+        """Switch Chroma's SQLite store to write-ahead logging.
+
+        WAL mode is persisted in the database file, so setting it once from a
+        short-lived connection applies to Chroma's own connections as well.
+        """
+        db_path = os.path.join(settings.CHROMA_PERSIST_DIR, "chroma.sqlite3")
+        if not os.path.exists(db_path):
+            return
+        try:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable SQLite WAL mode: {e}")
+
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, reusing cached vectors for previously embedded content.
+
+        Only distinct texts missing from the embedding cache are sent to the
+        API; their vectors are cached for future uploads.
+        """
+        keys = [self.embedding_cache.key(text) for text in texts]
+        vectors = await asyncio.to_thread(self.embedding_cache.get_many, keys)
+
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        logger.info(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses.")
+        if misses:
+            fresh = dict(zip(misses, await self._embed_batches(list(misses.values()))))
+            await asyncio.to_thread(self.embedding_cache.put_many, fresh)
+            vectors.update(fresh)
+
+        return [vectors[key] for key in keys]
+
+    async def _embed_batches(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in concurrent, length-sorted mini-batches.
+
+        Chunks are sorted by length so each batch carries a similar token
+        count, then dispatched concurrently (bounded by a semaphore to stay
+        under the API rate limit). Vectors are returned in the input order.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        size = settings.EMBEDDING_BATCH_SIZE
+        batches = [order[i:i + size] for i in range(0, len(order), size)]
+
+        async def embed_batch(indices: List[int]) -> List[List[float]]:
+            async with self._embed_semaphore:
+                return await self.embedding_function.aembed_documents(
+                    [texts[i] for i in indices]
+                )
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+        vectors: List[List[float]] = [[] for _ in texts]
+        for indices, batch_vectors in zip(batches, results):
+            for i, vector in zip(indices, batch_vectors):
+                vectors[i] = vector
+        return vectors
+
+    def _filter_new(
+        self, ids: List[str], texts: List[str], metadatas: Optional[List[dict]]
+    ) -> Tuple[List[str], List[str], Optional[List[dict]]]:
+        """Drop chunks whose id is already stored or repeated within the batch."""
+        seen = set(self.vector_db._collection.get(ids=ids, include=[])["ids"])
+        keep = []
+        for i, chunk_id in enumerate(ids):
+            if chunk_id not in seen:
+                seen.add(chunk_id)
+                keep.append(i)
+
+        return (
+            [ids[i] for i in keep],
+            [texts[i] for i in keep],
+            [metadatas[i] for i in keep] if metadatas is not None else None,
+        )
+
+    def _insert(
+        self,
+        ids: List[str],
+        vectors: List[List[float]],
+        metadatas: Optional[List[dict]],
+        texts: List[str],
+    ) -> None:
+        """Insert pre-computed embeddings in as few transactions as the client allows."""
+        for batch_ids, embeddings, batch_metadatas, documents in create_batches(
+            api=self.vector_db._client,
+            ids=ids,
+            embeddings=vectors,
+            metadatas=metadatas,
+            documents=texts,
+        ):
+            self.vector_db._collection.add(
+                ids=batch_ids,
+                embeddings=embeddings,
+                metadatas=batch_metadatas,
+                documents=documents,
+            )
+
+    async def aadd_texts(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> None:
+        """Asynchronously embed and store text chunks in the vector database.
+
+        Embeddings are computed via concurrent mini-batches and written to the
+        underlying Chroma collection directly, bypassing the synchronous
+        embedding path of ``Chroma.add_texts``. When stable ids are given,
+        chunks that are already stored are skipped without being re-embedded.
 
         Args:
             texts: List of text chunks to embed.
             metadatas: Optional metadata dicts (one per chunk).
+            ids: Optional stable ids (one per chunk); random ids are used otherwise.
         """
+        if not texts:
+            return
+
+        if ids is None:
+            ids = [uuid.uuid4().hex for _ in texts]
+        else:
+            total = len(texts)
+            ids, texts, metadatas = await asyncio.to_thread(self._filter_new, ids, texts, metadatas)
+            if not texts:
+                logger.info(f"All {total} chunks already stored — nothing to embed.")
+                return
+            logger.info(f"Skipping {total - len(texts)} already-stored chunks.")
+
         logger.info(f"Adding {len(texts)} chunks to vector database...")
         try:
-            self.vector_db.add_texts(texts=texts, metadatas=metadatas)
+            vectors = await self._embed_texts(texts)
+            await asyncio.to_thread(self._insert, ids, vectors, metadatas, texts)
             logger.info("Chunks persisted successfully.")
         except Exception as e:
             logger.error(f"Failed to add texts to vector DB: {e}")
             raise
 
-    def search_similar(self, query: str, k: int = 4) -> list:
-        """Perform semantic similarity search.
+    def _reconcile_source(self, source: str, ids: List[str], metadatas: List[dict]) -> None:
+        """Make the stored chunks of ``source`` match its latest upload."""
+        latest: Dict[str, dict] = {}
+        for chunk_id, metadata in zip(ids, metadatas):
+            latest.setdefault(chunk_id, metadata)
+
+        for batch_ids, _, batch_metadatas, _ in create_batches(
+            api=self.vector_db._client,
+            ids=list(latest),
+            metadatas=list(latest.values()),
+        ):
+            self.vector_db._collection.update(ids=batch_ids, metadatas=batch_metadatas)
+
+        stored = self.vector_db._collection.get(where={"source": source}, include=[])["ids"]
+        stale = [chunk_id for chunk_id in stored if chunk_id not in latest]
+        if stale:
+            self.vector_db._collection.delete(ids=stale)
+            logger.info(f"Removed {len(stale)} outdated chunks of '{source}'.")
+
+    async def reconcile_source(self, source: str, ids: List[str], metadatas: List[dict]) -> None:
+        """Refresh metadata of kept chunks and delete chunks no longer in ``source``.
+
+        Called after a (re-)upload so a modified document does not leave its
+        previous version's chunks behind, and unchanged chunks carry their new
+        position.
+
+        Args:
+            source: The document's source name.
+            ids: Ids of every chunk in the latest upload.
+            metadatas: Metadata dicts matching ``ids``.
+        """
+        await asyncio.to_thread(self._reconcile_source, source, ids, metadatas)
+
+    @staticmethod
+    def _is_invalid_input(error: BaseException) -> bool:
+        """Whether an embedding error was caused by the request inputs (HTTP 400)."""
+        while error is not None:
+            if isinstance(error, InvalidArgument):
+                return True
+            error = error.__cause__
+        return False
+
+    async def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed a batch of search queries in one API call."""
+        return await self.embedding_function.aembed_documents(
+            queries, task_type="RETRIEVAL_QUERY"
+        )
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, micro-batched with concurrent requests.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            The query embedding vector.
+        """
+        return await self.query_batcher.embed(query)
+
+    async def search_similar(self, query: str, k: int = 4) -> list:
+        """Perform semantic similarity search without blocking the event loop.
 
         Args:
             query: The search query string.
@@ -51,7 +261,23 @@ class VectorService:
             List of matching LangChain Document objects.
         """
         logger.info(f"Semantic search: '{query}' (k={k})")
-        return self.vector_db.similarity_search(query, k=k)
+        embedding = await self.embed_query(query)
+        return await self.search_by_vector(embedding, k=k)
+
+    async def search_by_vector(self, embedding: List[float], k: int = 4) -> list:
+        """Perform similarity search with a pre-computed query embedding.
+
+        The Chroma query runs in a worker thread so the event loop stays free.
+
+        Args:
+            embedding: The query embedding vector.
+            k: Number of top results to return.
+
+        Returns:
+            List of matching LangChain Document objects.
+        """
+        logger.info(f"Vector search (k={k})")
+        return await asyncio.to_thread(self.vector_db.similarity_search_by_vector, embedding, k=k)
 
 
-vector_service = VectorService()
\ No newline at end of file
+vector_service = VectorService()
@@ -0,0 +1,61 @@
+"""Offset-based text splitter that packs chunks with C-level string scans."""
+
+import re
+from typing import List, Optional, Sequence
+
+from langchain_text_splitters import TextSplitter
+
+_NON_SPACE = re.compile(r"\S")
+_SPACE = re.compile(r"\s")
+
+
+class FastTextSplitter(TextSplitter):
+    """Greedy window splitter with the same separator preference as the recursive splitter.
+
+    Each chunk is cut at the last occurrence of the coarsest separator found in
+    the second half of a ``chunk_size`` window (falling back to finer separators
+    and finally a hard cut). Boundaries are located with ``str.rfind`` and
+    compiled regex searches on the original text, so the Python loop runs once
+    per chunk rather than once per token, with no recursion.
+    """
+
+    def __init__(self, separators: Optional[Sequence[str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._separators = [s for s in (separators or ["\n\n", "\n", " "]) if s]
+
+    def _find_end(self, text: str, start: int) -> int:
+        """Return the cut position for a chunk starting at ``start``."""
+        limit = start + self._chunk_size
+        if limit >= len(text):
+            return len(text)
+
+        midpoint = start + self._chunk_size // 2
+        fallback = -1
+        for separator in self._separators:
+            idx = text.rfind(separator, start + 1, limit)
+            if idx > midpoint:
+                return idx
+            fallback = max(fallback, idx)
+        return fallback if fallback > start else limit
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most ``chunk_size`` characters."""
+        chunks: List[str] = []
+        start = 0
+        while True:
+            match = _NON_SPACE.search(text, start)
+            if match is None:
+                break
+            start = match.start()
+
+            end = self._find_end(text, start)
+            chunks.append(text[start:end].rstrip())
+            if end >= len(text):
+                break
+
+            if end - start <= self._chunk_overlap:
+                start = end
+                continue
+            boundary = _SPACE.search(text, end - self._chunk_overlap, end)
+            start = boundary.end() if boundary else end
+        return chunks
@@ -0,0 +1,56 @@
+"""Tests for query-embedding micro-batching."""
+
+import asyncio
+
+from app.services.embedding_batcher import MicroBatcher
+
+
+def test_concurrent_requests_share_batches():
+    calls = []
+
+    async def embed(texts):
+        calls.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def main():
+        batcher = MicroBatcher(embed, max_batch_size=32)
+        return await asyncio.gather(*(batcher.embed("x" * i) for i in range(40)))
+
+    assert asyncio.run(main()) == [[float(i)] for i in range(40)]
+    assert calls == [32, 8]
+
+
+def test_input_error_only_fails_its_caller():
+    async def embed(texts):
+        if "bad" in texts:
+            raise ValueError("bad query")
+        return [[1.0] for _ in texts]
+
+    async def main():
+        batcher = MicroBatcher(embed, is_input_error=lambda e: isinstance(e, ValueError))
+        return await asyncio.gather(
+            batcher.embed("good"), batcher.embed("bad"), batcher.embed("fine"),
+            return_exceptions=True,
+        )
+
+    good, bad, fine = asyncio.run(main())
+    assert good == [1.0] and fine == [1.0]
+    assert isinstance(bad, ValueError)
+
+
+def test_service_error_fails_batch_without_retries():
+    calls = []
+
+    async def embed(texts):
+        calls.append(len(texts))
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    async def main():
+        batcher = MicroBatcher(embed, is_input_error=lambda e: isinstance(e, ValueError))
+        return await asyncio.gather(
+            *(batcher.embed(str(i)) for i in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert calls == [5]
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,39 @@
+"""Tests for the on-disk embedding cache."""
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+def _vec(seed, dim=64):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+def test_round_trip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), "model-a")
+    items = {cache.key(f"chunk {i}"): _vec(i) for i in range(10)}
+    cache.put_many(items)
+
+    found = cache.get_many(list(items) + [cache.key("missing")])
+    assert set(found) == set(items)
+    for key, vector in items.items():
+        assert isinstance(found[key][0], float)
+        np.testing.assert_allclose(found[key], vector, rtol=1e-3, atol=1e-3)
+
+
+def test_key_depends_on_model(tmp_path):
+    a = EmbeddingCache(str(tmp_path / "cache.db"), "model-a")
+    b = EmbeddingCache(str(tmp_path / "cache.db"), "model-b")
+    assert a.key("same text") == a.key("same text")
+    assert a.key("same text") != b.key("same text")
+
+
+def test_get_many_beyond_batch_limit(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), "model-a")
+    count = EmbeddingCache._BATCH * 2 + 7
+    items = {cache.key(str(i)): [float(i % 100)] for i in range(count)}
+    cache.put_many(items)
+
+    found = cache.get_many(list(items))
+    assert len(found) == count
+    assert all(found[key] == vector for key, vector in items.items())
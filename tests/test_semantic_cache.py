@@ -0,0 +1,70 @@
+"""Tests for the semantic answer cache."""
+
+import numpy as np
+
+from app.services.semantic_cache import SemanticCache
+
+
+def _vec(seed: int, dim: int = 64) -> list:
+    return np.random.default_rng(seed).standard_normal(dim).tolist()
+
+
+def test_store_then_lookup_on_fresh_cache():
+    cache = SemanticCache()
+    cache.store(_vec(0), 3, {"answer": "a", "sources": []})
+
+    assert cache.lookup(_vec(0), 3) == {"answer": "a", "sources": []}
+    assert cache.lookup(_vec(1), 3) is None
+
+
+def test_lookup_requires_same_k():
+    cache = SemanticCache()
+    cache.store(_vec(0), 3, {"answer": "a", "sources": []})
+
+    assert cache.lookup(_vec(0), 5) is None
+
+
+def test_store_after_clear():
+    cache = SemanticCache()
+    cache.store(_vec(0), 3, {"answer": "a", "sources": []})
+    cache.clear()
+
+    assert cache.lookup(_vec(0), 3) is None
+    cache.store(_vec(0), 3, {"answer": "b", "sources": []})
+    assert cache.lookup(_vec(0), 3)["answer"] == "b"
+
+
+def test_evicts_least_recently_used():
+    cache = SemanticCache(max_entries=2, block_rows=1)
+    cache.store(_vec(0), 3, {"answer": "0"})
+    cache.store(_vec(1), 3, {"answer": "1"})
+    cache.lookup(_vec(0), 3)
+    cache.store(_vec(2), 3, {"answer": "2"})
+
+    assert len(cache) == 2
+    assert cache.lookup(_vec(1), 3) is None
+    assert cache.lookup(_vec(0), 3)["answer"] == "0"
+    assert cache.lookup(_vec(2), 3)["answer"] == "2"
+
+
+def test_expired_entries_are_not_returned(monkeypatch):
+    now = 1_000.0
+    monkeypatch.setattr("app.services.semantic_cache.time.time", lambda: now)
+    cache = SemanticCache(ttl=60)
+    cache.store(_vec(0), 3, {"answer": "a"})
+
+    now += 59
+    assert cache.lookup(_vec(0), 3)["answer"] == "a"
+    now += 2
+    assert cache.lookup(_vec(0), 3) is None
+
+
+def test_store_after_clear_with_stale_generation_is_dropped():
+    cache = SemanticCache()
+    generation = cache.generation
+    cache.clear()
+    cache.store(_vec(0), 3, {"answer": "stale"}, generation)
+
+    assert cache.lookup(_vec(0), 3) is None
+    cache.store(_vec(0), 3, {"answer": "fresh"}, cache.generation)
+    assert cache.lookup(_vec(0), 3)["answer"] == "fresh"
@@ -0,0 +1,68 @@
+"""Tests for the offset-based text splitter."""
+
+import random
+import re
+
+from app.utils.text_splitter import FastTextSplitter
+
+
+def _text(seed, words=3000):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(words):
+        word = "".join(rng.choice("abcdefghij") for _ in range(rng.randint(1, 12)))
+        parts.append(word + rng.choice([" ", " ", " ", "\n", "\n\n"]))
+    return "".join(parts)
+
+
+def _positions(text, chunks):
+    positions = []
+    start = 0
+    for chunk in chunks:
+        start = text.index(chunk, start)
+        positions.append(start)
+        start += 1
+    return positions
+
+
+def _splitter(chunk_size=1000, chunk_overlap=200):
+    return FastTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def test_chunks_respect_chunk_size():
+    for seed in range(5):
+        chunks = _splitter().split_text(_text(seed))
+        assert len(chunks) > 1
+        assert all(0 < len(chunk) <= 1000 for chunk in chunks)
+
+
+def test_overlap_is_bounded():
+    for seed in range(5):
+        text = _text(seed)
+        chunks = _splitter().split_text(text)
+        positions = _positions(text, chunks)
+        for pos, chunk, next_pos in zip(positions, chunks, positions[1:]):
+            assert pos < next_pos
+            assert pos + len(chunk) - next_pos <= 200
+
+
+def test_no_text_is_lost():
+    for seed in range(5):
+        text = _text(seed)
+        chunks = _splitter().split_text(text)
+        covered = set()
+        for pos, chunk in zip(_positions(text, chunks), chunks):
+            covered.update(range(pos, pos + len(chunk)))
+        assert all(m.start() in covered for m in re.finditer(r"\S", text))
+
+
+def test_long_token_is_hard_cut():
+    chunks = _splitter().split_text("x" * 2500)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+
+def test_empty_and_whitespace_input():
+    assert _splitter().split_text("") == []
+    assert _splitter().split_text(" \n\n\t  \n") == []